@@ -1,51 +1,169 @@
+import asyncio
 import logging
+import time
+from typing import Callable
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.dispatcher import async_dispatcher_send
-from homeassistant.const import Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, Platform
 from homeassistant.components.webhook import (
     async_register,
     async_unregister,
     async_generate_url,
 )
 import aiohttp
+import orjson
 
-from .const import DOMAIN
+from .const import DOMAIN, REQUEST_TIMEOUT
+from .coordinator import AquaFlowerDeviceCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = [Platform.SWITCH, Platform.NUMBER, Platform.SENSOR]
+DEVICES_FAILURE_BACKOFF = 30  # Seconds to stop calling /devices after a failed fetch
+
+# entry_id -> monotonic time of that entry's last failed /devices fetch; kept across reloads
+_devices_failed_at = {}
+WEBHOOK_REREGISTER_INTERVAL = 86400  # Re-announce an unchanged webhook URL at most once a day
 
 
 async def handle_webhook(hass: HomeAssistant, webhook_id: str, request) -> None:
-    """Handle incoming webhook data from the backend."""
+    """Handle incoming webhook data from the backend (a single event or a list of events)."""
     try:
         # Parse JSON payload
-        data = await request.json()
-        _LOGGER.info(f"Received Webhook Data: {data}")
-
-        device_id = data.get("device_id")
-        zone_id = data.get("zone_id")
-        state = data.get("state")
+        payload = orjson.loads(await request.read())
+        _LOGGER.info("Received Webhook Data: %s", payload)
 
-        # Log potential issues with data format
-        if not device_id:
-            _LOGGER.error("Webhook error: Missing device_id in payload")
-            return
-        if not zone_id:
-            _LOGGER.error("Webhook error: Missing zone_id in payload")
-            return
-        if state is None:
-            _LOGGER.error("Webhook error: Missing state in payload")
+        entry_data = hass.data.get(DOMAIN, {}).get(webhook_id.removeprefix("aquaflower_"))
+        if entry_data is None:
+            _LOGGER.error("Webhook error: No config entry for webhook %s", webhook_id)
             return
+        subs = entry_data["subs"]
+
+        for event in payload if isinstance(payload, list) else (payload,):
+            if not isinstance(event, dict):
+                _LOGGER.error("Webhook error: Event is not an object: %s", event)
+                continue
+            device_id = event.get("device_id")
+            zone_id = event.get("zone_id")
+            state = event.get("state")
 
-        _LOGGER.info(f"Webhook update -> Device {device_id}, Zone {zone_id}: {state}")
+            # Log potential issues with data format
+            if not device_id:
+                _LOGGER.error("Webhook error: Missing device_id in payload")
+                continue
+            if not zone_id:
+                _LOGGER.error("Webhook error: Missing zone_id in payload")
+                continue
+            if state is None:
+                _LOGGER.error("Webhook error: Missing state in payload")
+                continue
 
-        # Send the update to Home Assistant
-        async_dispatcher_send(hass, f"aquaflower_update_{device_id}_{zone_id}", state)
+            _LOGGER.info("Webhook update -> Device %s, Zone %s: %s", device_id, zone_id, state)
+
+            # Hand the update straight to the entities listening on this zone
+            for listener in subs.get((str(device_id), str(zone_id)), ()):
+                listener(state)
 
     except Exception as e:
-        _LOGGER.error(f"Webhook Handling Error: {e}")
+        _LOGGER.error("Webhook Handling Error: %s", e)
+
+
+@callback
+def register_zone_listener(
+    hass: HomeAssistant, entry_id: str, device_id: str, zone_id, listener: Callable[[str], None]
+) -> Callable[[], None]:
+    """Register a callback for webhook state updates of one zone and return its remover."""
+    subs = hass.data[DOMAIN][entry_id]["subs"]
+    key = (str(device_id), str(zone_id))
+    subs.setdefault(key, []).append(listener)
+
+    @callback
+    def remove_listener() -> None:
+        subs[key].remove(listener)
+        if not subs[key]:
+            del subs[key]
+
+    return remove_listener
+
+
+async def _fetch_devices(session: aiohttp.ClientSession, api_base_url: str, access_token: str):
+    """Fetch the account's devices from the AquaFlower API, or return None if the request failed."""
+    try:
+        async with session.get(
+            f"{api_base_url}/devices",
+            headers={
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json",
+            },
+        ) as response:
+            if response.status != 200:
+                _LOGGER.error("Failed to fetch devices. HTTP Status: %s", response.status)
+                return None
+            devices = orjson.loads(await response.read())
+            return devices if isinstance(devices, list) else []
+    except Exception as e:
+        _LOGGER.error("Error fetching devices: %s", e)
+        return None
+
+
+async def async_get_devices(hass: HomeAssistant, entry_id: str) -> list:
+    """Return the entry's devices, raising ConfigEntryNotReady if they are unavailable.
+
+    After a failed fetch, the backend is not asked again for this entry for
+    DEVICES_FAILURE_BACKOFF seconds, unless the entry is unloaded or removed meanwhile.
+    """
+    entry_data = hass.data[DOMAIN][entry_id]
+    failed_at = _devices_failed_at.get(entry_id)
+    if failed_at is not None:
+        remaining = DEVICES_FAILURE_BACKOFF - (time.monotonic() - failed_at)
+        if remaining > 0:
+            raise ConfigEntryNotReady(
+                f"AquaFlower backend failed recently, not fetching devices for another {remaining:.0f} s"
+            )
+
+    devices = await _fetch_devices(
+        entry_data["session"], entry_data["api_base_url"], entry_data["access_token"]
+    )
+    if devices is None:
+        _devices_failed_at[entry_id] = time.monotonic()
+        raise ConfigEntryNotReady("Could not fetch the AquaFlower device list")
+    _devices_failed_at.pop(entry_id, None)
+    return devices
+
+
+async def _register_webhook(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    session: aiohttp.ClientSession,
+    api_base_url: str,
+    access_token: str,
+    user_id: str,
+    webhook_url: str,
+) -> None:
+    """Send the webhook URL to the AquaFlower backend and remember when it was registered."""
+    try:
+        async with session.post(
+            f"{api_base_url}/registerWebhook",
+            data=orjson.dumps({"user_id": user_id, "webhook_url": webhook_url}),
+            headers={
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json",
+            },
+        ) as response:
+            if response.status == 200:
+                _LOGGER.info("Webhook successfully registered with AquaFlower backend.")
+                hass.config_entries.async_update_entry(
+                    entry,
+                    data={
+                        **entry.data,
+                        "webhook_url": webhook_url,
+                        "webhook_registered_at": time.time(),
+                    },
+                )
+            else:
+                _LOGGER.error("Failed to register webhook with backend: %s", response.status)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        _LOGGER.error("Error communicating with backend: %s", e)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -57,50 +175,96 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "access_token": entry.data.get("access_token"),
         "ha_ip": entry.data.get("ha_ip"),
         "user_id": entry.data.get("user_id"),
+        "subs": {},  # (device_id, zone_id) -> webhook state listeners
+        "devices": [],  # Fetched once here and read by every platform
+        "coordinators": {},  # device_id -> AquaFlowerDeviceCoordinator
     }
 
+    # ✅ Dedicated HTTP session whose keep-alive outlives the 30 s poll interval
+    # (75 s matches the common nginx default, so idle sockets are not kept past the server's own limit)
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=8,
+            ttl_dns_cache=600,
+            keepalive_timeout=75,
+        ),
+        timeout=REQUEST_TIMEOUT,
+    )
+    hass.data[DOMAIN][entry.entry_id]["session"] = session
+    entry.async_on_unload(session.close)  # Also runs when setup fails part-way
+
+    async def _async_close_session(event: Event) -> None:
+        """Close the session on shutdown, when Home Assistant does not unload entries."""
+        await session.close()
+
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session))
+
+    # ✅ Fetch devices once and poll each one through a coordinator shared by all platforms
+    api_base_url = entry.data.get("api_base_url")
+    access_token = entry.data.get("access_token")
+    user_id = entry.data.get("user_id")
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    if api_base_url and access_token:
+        try:
+            devices = await async_get_devices(hass, entry.entry_id)
+        except ConfigEntryNotReady:
+            # Let Home Assistant retry the setup with its own backoff
+            hass.data[DOMAIN].pop(entry.entry_id)
+            raise
+        entry_data["devices"] = devices
+        coordinators = entry_data["coordinators"]
+        for device in devices:
+            device_id = device.get("device_id")
+            coordinators[device_id] = AquaFlowerDeviceCoordinator(
+                hass, session, api_base_url, access_token, user_id, device_id
+            )
+            entry.async_on_unload(coordinators[device_id].async_shutdown)
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators.values()))
+
     # ✅ Register Webhook
     webhook_id = f"aquaflower_{entry.entry_id}"
     webhook_url = async_generate_url(hass, webhook_id)
+    hass.data[DOMAIN][entry.entry_id]["webhook_id"] = webhook_id
     hass.data[DOMAIN][entry.entry_id]["webhook_url"] = webhook_url
 
     async_register(
         hass, DOMAIN, "AquaFlower Webhook", webhook_id, handle_webhook
     )
 
-    _LOGGER.info(f"AquaFlower Webhook Registered: {webhook_url}")
+    _LOGGER.info("AquaFlower Webhook Registered: %s", webhook_url)
 
-    # ✅ Send Webhook URL to Backend
-    api_base_url = entry.data.get("api_base_url")
-    access_token = entry.data.get("access_token")
-    user_id = entry.data.get("user_id")
+    # ✅ Send Webhook URL to Backend while the platforms set up
+    register_task = None
 
-    if api_base_url and access_token and user_id:
-        session = async_get_clientsession(hass)
-        try:
-            async with session.post(
-                f"{api_base_url}/registerWebhook",
-                json={"user_id": user_id, "webhook_url": webhook_url},
-                headers={"Authorization": f"Bearer {access_token}"},
-            ) as response:
-                if response.status == 200:
-                    _LOGGER.info("Webhook successfully registered with AquaFlower backend.")
-                else:
-                    _LOGGER.error(f"Failed to register webhook with backend: {response.status}")
-        except aiohttp.ClientError as e:
-            _LOGGER.error(f"Error communicating with backend: {e}")
+    if (
+        webhook_url == entry.data.get("webhook_url")
+        and entry.data.get("webhook_registered_at", 0) > time.time() - WEBHOOK_REREGISTER_INTERVAL
+    ):
+        _LOGGER.debug("Webhook URL unchanged and recently registered, skipping backend registration")
+    elif api_base_url and access_token and user_id:
+        register_task = hass.async_create_task(
+            _register_webhook(hass, entry, session, api_base_url, access_token, user_id, webhook_url)
+        )
 
     # ✅ Forward entry setup to platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if register_task is not None:
+        await register_task
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload AquaFlower config entry."""
-    webhook_id = f"aquaflower_{entry.entry_id}"
-    async_unregister(hass, webhook_id)
+    async_unregister(hass, hass.data[DOMAIN][entry.entry_id]["webhook_id"])
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        _devices_failed_at.pop(entry.entry_id, None)  # A manual reload may try the backend again
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget a removed entry's /devices failure time."""
+    _devices_failed_at.pop(entry.entry_id, None)
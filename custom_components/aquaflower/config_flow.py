@@ -1,5 +1,7 @@
+import functools
 import logging
 import aiohttp
+import orjson
 import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 from homeassistant import config_entries
@@ -7,12 +9,29 @@ from homeassistant.core import callback
 from homeassistant.helpers import aiohttp_client
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
 from homeassistant.components.webhook import async_generate_url
-from .const import DOMAIN
+from .const import DOMAIN, REQUEST_TIMEOUT
 
 _LOGGER = logging.getLogger(__name__)
 
 CONF_HA_IP = "ha_ip"
 
+USER_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_USERNAME): str,
+        vol.Required(CONF_PASSWORD): str,
+        vol.Required(CONF_HA_IP): str,
+    }
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _devices_schema(device_items: tuple) -> vol.Schema:
+    """Build (and memoize) the device selection schema for a set of (device_id, name) pairs."""
+    devices = dict(device_items)
+    return vol.Schema({
+        vol.Required("devices", default=list(devices)): cv.multi_select(devices),
+    })
+
 
 class AquaFlowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle the configuration flow for AquaFlower Integration."""
@@ -41,10 +60,11 @@ class AquaFlowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             try:
                 auth_response = await self.api_session.post(
                     "https://iot.theaquaflower.com/api/login",
-                    json={"email": email, "password": password},
+                    data=orjson.dumps({"email": email, "password": password}),
                     headers={"Content-Type": "application/json"},  # ✅ Fix API header issue
+                    timeout=REQUEST_TIMEOUT,
                 )
-                auth_data = await auth_response.json()
+                auth_data = await auth_response.json(loads=orjson.loads)
 
                 if auth_response.status == 200 and "accessToken" in auth_data and "userId" in auth_data:
                     self.access_token = auth_data["accessToken"]
@@ -54,18 +74,12 @@ class AquaFlowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     errors["base"] = "invalid_auth"
 
             except Exception as e:
-                _LOGGER.error(f"Error during login: {e}")
+                _LOGGER.error("Error during login: %s", e)
                 errors["base"] = "cannot_connect"
 
         return self.async_show_form(
             step_id="user",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(CONF_USERNAME): str,
-                    vol.Required(CONF_PASSWORD): str,
-                    vol.Required(CONF_HA_IP): str,
-                }
-            ),
+            data_schema=USER_SCHEMA,
             errors=errors,
         )
 
@@ -80,8 +94,9 @@ class AquaFlowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     "Authorization": f"Bearer {self.access_token}",
                     "Content-Type": "application/json",  # ✅ Fix API header issue
                 },
+                timeout=REQUEST_TIMEOUT,
             )
-            device_data = await device_response.json()
+            device_data = await device_response.json(loads=orjson.loads)
 
             if device_response.status == 200 and isinstance(device_data, list):
                 self.devices = {device["device_id"]: device["name"] for device in device_data}
@@ -89,7 +104,7 @@ class AquaFlowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "cannot_fetch_devices"
 
         except Exception as e:
-            _LOGGER.error(f"Error fetching devices: {e}")
+            _LOGGER.error("Error fetching devices: %s", e)
             errors["base"] = "cannot_fetch_devices"
 
         if not self.devices:
@@ -97,9 +112,7 @@ class AquaFlowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="confirm_devices",
-            data_schema=vol.Schema({
-                vol.Required("devices", default=list(self.devices.keys())): cv.multi_select(self.devices),
-            }),
+            data_schema=_devices_schema(tuple(self.devices.items())),
             errors=errors,
         )
 
@@ -110,39 +123,36 @@ class AquaFlowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             webhook_id = f"aquaflower_{self.user_id}"
             self.webhook_url = async_generate_url(self.hass, webhook_id)
 
-            _LOGGER.info(f"Generated Webhook URL: {self.webhook_url}")
+            _LOGGER.info("Generated Webhook URL: %s", self.webhook_url)
 
             # ✅ Send the Webhook URL to AquaFlower Backend
             try:
                 async with self.api_session.post(
                     "https://iot.theaquaflower.com/api/registerWebhook",
-                    json={
+                    data=orjson.dumps({
                         "user_id": self.user_id,
                         "webhook_url": self.webhook_url,
-                    },
+                    }),
                     headers={
                         "Authorization": f"Bearer {self.access_token}",
                         "Content-Type": "application/json",
                     },
+                    timeout=REQUEST_TIMEOUT,
                 ) as response:
                     if response.status == 200:
                         _LOGGER.info("Webhook registered with AquaFlower backend.")
                     else:
-                        _LOGGER.error(f"Failed to register webhook with backend: {response.status}")
+                        _LOGGER.error("Failed to register webhook with backend: %s", response.status)
                         return self.async_show_form(
                             step_id="confirm_devices",
-                            data_schema=vol.Schema({
-                                vol.Required("devices", default=list(self.devices.keys())): cv.multi_select(self.devices),
-                            }),
+                            data_schema=_devices_schema(tuple(self.devices.items())),
                             errors={"base": "cannot_register_webhook"},
                         )
             except aiohttp.ClientError as e:
-                _LOGGER.error(f"Error registering webhook: {e}")
+                _LOGGER.error("Error registering webhook: %s", e)
                 return self.async_show_form(
                     step_id="confirm_devices",
-                    data_schema=vol.Schema({
-                        vol.Required("devices", default=list(self.devices.keys())): cv.multi_select(self.devices),
-                    }),
+                    data_schema=_devices_schema(tuple(self.devices.items())),
                     errors={"base": "cannot_connect"},
                 )
 
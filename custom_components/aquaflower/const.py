@@ -1,6 +1,16 @@
+from aiohttp import ClientTimeout
+
 DOMAIN = "aquaflower"
 CONF_SECRET = "secret"
 CONF_API_BASE_URL = "api_base_url"
 CONF_ACCESS_TOKEN = "access_token"
 CONF_USER_ID = "user_id"
-CONF_HA_IP = "ha_ip"
\ No newline at end of file
+CONF_HA_IP = "ha_ip"
+
+# Fail fast on a dead backend: 3 s to connect, 7 s between reads, 10 s overall
+REQUEST_TIMEOUT = ClientTimeout(total=10, sock_connect=3, sock_read=7)
+ERROR_BODY_LIMIT = 512  # Bytes of an error response body worth logging
+
+# Every AquaFlower controller has 6 static zones
+ZONES = tuple(range(1, 7))
+ZONE_NAMES = tuple(f"Zone {zone_number}" for zone_number in ZONES)
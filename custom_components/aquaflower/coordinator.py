@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import logging
+from datetime import timedelta
+import aiohttp
+import orjson
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import ERROR_BODY_LIMIT, ZONES
+
+_LOGGER = logging.getLogger(__name__)
+REQUEST_REFRESH_COOLDOWN = 2.0  # Seconds; collapses bursts of refresh requests into one fetch
+
+
+class AquaFlowerDeviceCoordinator(DataUpdateCoordinator):
+    """Poll a device's water data and zone status once per tick for both its switches and sensors.
+
+    Data is ``{zone_number: {"on": bool | None, "daily_on_time": int}}``. Zones whose ``state``
+    the water-data payload carried last time are not polled through their status endpoint
+    unless that payload cannot be fetched. Each source can fail on its own; the update only
+    fails when neither yields anything.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        api_base_url: str,
+        access_token: str,
+        user_id: str,
+        device_id: str,
+    ):
+        """Initialize the device coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"aquaflower_device_{device_id}",
+            update_interval=timedelta(seconds=30),
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=REQUEST_REFRESH_COOLDOWN, immediate=True
+            ),
+            always_update=False,  # Only notify entities when a zone actually changes
+        )
+        self._session = session
+        self._device_id = device_id
+        # Water data is per user; without a user id the zone status endpoints are all there is
+        self._water_url = f"{api_base_url}/water-data/{user_id}/{device_id}" if user_id else None
+        self._status_urls = {
+            zone_number: f"{api_base_url}/device/{device_id}/zone/{zone_number}/status"
+            for zone_number in ZONES
+        }
+        self._headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
+        self._etag = None
+        self._body_digest = None
+        self._water = None  # Last parsed (on_times, states) from the water-data endpoint
+
+    async def _async_fetch_water_data(self):
+        """Return ``(on_times, states)`` parsed from the device's water data, or None on failure.
+
+        Unchanged payloads (a 304 for our ETag, or an identical body) reuse the previous
+        parse without decoding the JSON again.
+        """
+        if self._water_url is None:
+            return None
+
+        headers = self._headers
+        if self._etag is not None and self._water is not None:
+            headers = {**self._headers, "If-None-Match": self._etag}
+
+        try:
+            async with self._session.get(self._water_url, headers=headers) as response:
+                if response.status == 304:
+                    return self._water
+                if response.status != 200:
+                    _LOGGER.error(
+                        "Failed to fetch water data for device %s. HTTP Status: %s", self._device_id, response.status
+                    )
+                    return None
+                body = await response.read()
+                etag = response.headers.get("ETag")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _LOGGER.error("Error fetching water data for device %s: %s", self._device_id, e)
+            return None
+
+        digest = hashlib.blake2b(body, digest_size=8).digest()
+        if digest == self._body_digest and self._water is not None:
+            self._etag = etag
+            return self._water
+
+        # Normalise types once per refresh so each entity is a plain dict lookup
+        try:
+            entries = orjson.loads(body)
+        except ValueError as e:
+            _LOGGER.error("Invalid water data for device %s: %s", self._device_id, e)
+            return None
+        if not isinstance(entries, list):
+            _LOGGER.error("Unexpected water data for device %s: %s", self._device_id, entries)
+            return None
+
+        on_times = {}
+        states = {}
+        for entry in entries:
+            try:
+                zone_number = int(entry["zone_id"])
+                on_times[zone_number] = int(entry.get("daily_on_time", 0))
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.debug("Skipping malformed water data entry for device %s: %s", self._device_id, entry)
+                continue
+            if "state" in entry:
+                states[zone_number] = entry["state"] == "on"
+
+        self._water = (on_times, states)
+        self._etag = etag
+        self._body_digest = digest
+        return self._water
+
+    async def _async_fetch_zone(self, zone_number: int):
+        """Return whether a zone is on, or None if its status could not be read."""
+        try:
+            async with self._session.get(self._status_urls[zone_number], headers=self._headers) as response:
+                if response.status != 200:
+                    if _LOGGER.isEnabledFor(logging.ERROR):
+                        body = (await response.content.read(ERROR_BODY_LIMIT)).decode("utf-8", "replace")
+                        _LOGGER.error("Failed to fetch status: %s - %s", response.status, body)
+                    return None
+                data = orjson.loads(await response.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            _LOGGER.error("Error fetching status: %s", e)
+            return None
+
+        # ✅ Ensure 'state' and 'action' are properly checked
+        if not isinstance(data, dict):
+            _LOGGER.warning("Unexpected status response: %s", data)
+            return None
+        if "state" in data:
+            return data["state"] == "on"
+        if "action" in data:  # Fallback check if only action is sent
+            return data["action"] == "on"
+        _LOGGER.warning("Missing 'state' or 'action' field in response: %s", data)
+        return None
+
+    async def _async_fetch_zones(self, zones) -> dict:
+        """Return ``{zone_number: on}`` for the zones whose status could be read."""
+        fetched = await asyncio.gather(*(self._async_fetch_zone(zone_number) for zone_number in zones))
+        return {zone_number: state for zone_number, state in zip(zones, fetched) if state is not None}
+
+    async def _async_update_data(self):
+        """Fetch water data and, at the same time, the status of zones it did not report last time."""
+        reported = self._water[1] if self._water is not None else {}
+        water, statuses = await asyncio.gather(
+            self._async_fetch_water_data(),
+            self._async_fetch_zones([zone_number for zone_number in ZONES if zone_number not in reported]),
+        )
+
+        if water is not None:
+            on_times, states = water
+        else:
+            # Keep the last known on times; zone states must come from the status endpoints
+            on_times = self._water[0] if self._water is not None else {}
+            states = {}
+
+        # Zones skipped because the water data used to report them, but did not this tick
+        missing = [zone_number for zone_number in reported if zone_number not in states]
+        if missing:
+            statuses = {**statuses, **await self._async_fetch_zones(missing)}
+
+        if water is None and not statuses:
+            raise UpdateFailed(f"Failed to fetch water data and zone status for device {self._device_id}")
+
+        states = {**statuses, **states}
+        return {
+            zone_number: {"on": states.get(zone_number), "daily_on_time": on_times.get(zone_number, 0)}
+            for zone_number in ZONES
+        }
+
+
+class AquaFlowerScheduleCoordinator(DataUpdateCoordinator):
+    """Poll a device's schedules for its schedule sensors.
+
+    Data is ``{schedule_id: schedule}`` as returned by the backend.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        api_base_url: str,
+        access_token: str,
+        device_id: str,
+    ):
+        """Initialize the schedule coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"aquaflower_schedules_{device_id}",
+            update_interval=timedelta(seconds=30),
+        )
+        self._session = session
+        self._device_id = device_id
+        self._url = f"{api_base_url}/schedules/{device_id}"
+        self._headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
+
+    async def _async_update_data(self):
+        """Fetch the device's schedules, keyed by schedule id."""
+        try:
+            async with self._session.get(self._url, headers=self._headers) as response:
+                if response.status != 200:
+                    raise UpdateFailed(
+                        f"Failed to fetch schedules for device {self._device_id}. HTTP Status: {response.status}"
+                    )
+                schedules = orjson.loads(await response.read())
+        except (aiohttp.ClientError, ValueError) as e:
+            raise UpdateFailed(f"Error fetching schedules for device {self._device_id}: {e}") from e
+
+        if not isinstance(schedules, list):
+            raise UpdateFailed(f"Unexpected schedules for device {self._device_id}: {schedules}")
+        return {schedule.get("id"): schedule for schedule in schedules if isinstance(schedule, dict)}
@@ -1,13 +1,15 @@
 import logging
 import aiohttp
-from typing import List, Dict
+import orjson
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from . import register_zone_listener
+from .const import DOMAIN, ERROR_BODY_LIMIT, ZONE_NAMES, ZONES
+from .coordinator import AquaFlowerDeviceCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,25 +27,30 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         _LOGGER.error("Missing API base URL or access token in config data")
         return
 
-    # Fetch devices from AquaFlower backend
-    devices = await fetch_devices(hass, api_base_url, access_token)
+    # Reuse the device list fetched during integration setup
+    session = data["session"]
+    devices = data["devices"]
     if not devices:
         _LOGGER.error("No devices found for AquaFlower integration")
         return
 
-    # Add switches for 6 static zones per device
+    # Add switches for 6 static zones per device, fed by the device coordinators shared with the sensors
     switches = []
+    coordinators = data["coordinators"]
     for device in devices:
         device_id = device.get("device_id")
         device_name = device.get("name")
+        coordinator = coordinators[device_id]
 
         # Generate 6 static zones for each device
-        for zone_number in range(1, 7):  # Zones 1 to 6
-            zone_name = f"Zone {zone_number}"
+        for zone_number, zone_name in zip(ZONES, ZONE_NAMES):
             unique_zone_id = f"{device_id}_zone_{zone_number}"
             _LOGGER.debug("Creating switch for device %s, zone %s", device_name, zone_name)
             switches.append(
                 AquaFlowerSwitch(
+                    coordinator,
+                    session,
+                    entry.entry_id,
                     api_base_url,
                     access_token,
                     device_id,
@@ -55,49 +62,62 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
 
     if switches:
         _LOGGER.debug("Adding switches to Home Assistant: %s", [s.name for s in switches])
-        async_add_entities(switches, update_before_add=True)
+        async_add_entities(switches)
     else:
         _LOGGER.warning("No switches created for AquaFlower")
 
 
-async def fetch_devices(hass: HomeAssistant, api_base_url: str, access_token: str) -> List[Dict]:
-    """Fetch devices from AquaFlower API."""
-    _LOGGER.debug("Fetching devices from AquaFlower API at %s", api_base_url)
-    session = async_get_clientsession(hass)
-    url = f"{api_base_url}/devices"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-    }
-
-    try:
-        async with session.get(url, headers=headers) as response:
-            if response.status != 200:
-                _LOGGER.error("Failed to fetch devices. HTTP Status: %s", response.status)
-                return []
-
-            devices = await response.json()
-            _LOGGER.debug("Fetched devices: %s", devices)
-            return devices if isinstance(devices, list) else []
-    except Exception as e:
-        _LOGGER.error("Error fetching devices: %s", e)
-        return []
-
-
-class AquaFlowerSwitch(SwitchEntity):
+class AquaFlowerSwitch(CoordinatorEntity, SwitchEntity):
     """Representation of an AquaFlower zone switch."""
 
-    def __init__(self, api_base_url: str, access_token: str, device_id: str, zone_number: int, name: str, unique_id: str):
+    def __init__(self, coordinator: AquaFlowerDeviceCoordinator, session: aiohttp.ClientSession, entry_id: str, api_base_url: str, access_token: str, device_id: str, zone_number: int, name: str, unique_id: str):
         """Initialize the switch."""
-        self._api_base_url = api_base_url
-        self._access_token = access_token
+        super().__init__(coordinator)
+        self._session = session
+        self._entry_id = entry_id
         self._device_id = device_id
         self._zone_number = zone_number
         self._attr_name = name
         self._attr_unique_id = unique_id
-        self._attr_is_on = False
-        self._attr_available = True  # Assume available unless an error occurs
+        self._attr_is_on = bool((coordinator.data or {}).get(zone_number, {}).get("on"))
         self._attr_entity_category = EntityCategory.CONFIG
+        self._headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
+        self._command_url = f"{api_base_url}/mqtt/publish"
+        command_topic = f"/device/{device_id}/zone/{zone_number}/command"
+        # Only the action varies, so both request bodies are serialized once up front
+        self._payloads = {
+            action: orjson.dumps({"topic": command_topic, "message": {"action": action}})
+            for action in ("on", "off")
+        }
+
+    async def async_added_to_hass(self):
+        """Subscribe to webhook state pushes for this zone."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            register_zone_listener(
+                self.hass, self._entry_id, self._device_id, self._zone_number, self._handle_webhook_state
+            )
+        )
+
+    @callback
+    def _handle_webhook_state(self, state: str) -> None:
+        """Apply a zone state pushed by the AquaFlower backend."""
+        self._attr_is_on = state == "on"
+        self.async_write_ha_state()
+        # The zone's on time moved too; the refresh is debounced across zones
+        self.hass.async_create_task(self.coordinator.async_request_refresh())
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Apply the zone state from the device's latest status poll."""
+        new_state = (self.coordinator.data or {}).get(self._zone_number, {}).get("on")
+        if new_state is not None and new_state != self._attr_is_on:
+            self._attr_is_on = new_state
+            _LOGGER.info("Updated zone %s for device %s to %s", self._zone_number, self._device_id, new_state)
+        super()._handle_coordinator_update()
 
     async def async_turn_on(self, **kwargs):
         """Turn the zone on."""
@@ -105,6 +125,7 @@ class AquaFlowerSwitch(SwitchEntity):
         if success:
             self._attr_is_on = True
             self.async_write_ha_state()
+            await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self, **kwargs):
         """Turn the zone off."""
@@ -112,78 +133,19 @@ class AquaFlowerSwitch(SwitchEntity):
         if success:
             self._attr_is_on = False
             self.async_write_ha_state()
+            await self.coordinator.async_request_refresh()
 
     async def _send_command(self, command: str) -> bool:
         """Send an on/off command to the AquaFlower backend."""
-        url = f"{self._api_base_url}/mqtt/publish"
-        payload = {
-            "topic": f"/device/{self._device_id}/zone/{self._zone_number}/command",
-            "message": {"action": command},
-        }
-        headers = {
-            "Authorization": f"Bearer {self._access_token}",
-            "Content-Type": "application/json",
-        }
-
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers, timeout=10) as response:
-                    if response.status == 200:
-                        _LOGGER.info("Sent command '%s' to %s", command, self._attr_name)
-                        return True
-                    else:
-                        _LOGGER.error(
-                            "Failed to send command '%s': %s - %s",
-                            command, response.status, await response.text()
-                        )
+            async with self._session.post(self._command_url, data=self._payloads[command], headers=self._headers) as response:
+                if response.status == 200:
+                    _LOGGER.info("Sent command '%s' to %s", command, self._attr_name)
+                    return True
+                elif _LOGGER.isEnabledFor(logging.ERROR):
+                    body = (await response.content.read(ERROR_BODY_LIMIT)).decode("utf-8", "replace")
+                    _LOGGER.error("Failed to send command '%s': %s - %s", command, response.status, body)
         except Exception as e:
             _LOGGER.error("Error sending command '%s': %s", command, e)
 
         return False
-
-    async def async_update(self):
-        """Fetch the latest status of the zone from the backend."""
-        url = f"{self._api_base_url}/device/{self._device_id}/zone/{self._zone_number}/status"
-        headers = {
-            "Authorization": f"Bearer {self._access_token}",
-            "Content-Type": "application/json",
-        }
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        # ✅ Ensure 'state' and 'action' are properly checked
-                        if "state" in data:
-                            new_state = data["state"] == "on"
-                            if self._attr_is_on != new_state:
-                                self._attr_is_on = new_state
-                                _LOGGER.info("Updated zone %s for device %s to %s", self._zone_number, self._device_id, self._attr_is_on)
-                                self.async_write_ha_state()  # ✅ Ensure UI updates
-
-                        elif "action" in data:  # Fallback check if only action is sent
-                            new_state = data["action"] == "on"
-                            if self._attr_is_on != new_state:
-                                self._attr_is_on = new_state
-                                _LOGGER.info("Updated via action field: Zone %s for device %s to %s", self._zone_number, self._device_id, self._attr_is_on)
-                                self.async_write_ha_state()
-
-                        else:
-                            _LOGGER.warning("Missing 'state' or 'action' field in response: %s", data)
-
-                        self._attr_available = True  # Mark available if successful
-
-                    else:
-                        _LOGGER.error("Failed to fetch status: %s - %s", response.status, await response.text())
-                        self._attr_available = False  # Mark unavailable if fetch fails
-
-        except Exception as e:
-            _LOGGER.error("Error fetching status: %s", e)
-            self._attr_available = False  # Mark unavailable if an error occurs
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._attr_available